@@ -106,12 +106,11 @@ def _aac_concat(session: Session,
 
     # Extract audio from all videos in session before
     # concatenating them.
-    session.audio.file_list = [
-        MultimediaTools.extract_audio(filepath=j,
-                                      overwrite=overwrite,
-                                      output=workdir.joinpath(
-                                          j.with_suffix(".aac").name))
-        for j in session.video.file_list]
+    session.audio.file_list = MultimediaTools.map_parallel(
+        MultimediaTools.extract_audio,
+        [(j, workdir.joinpath(j.with_suffix(".aac").name), overwrite)
+         for j in session.video.file_list]
+    )
 
     session.sort_audios()
 
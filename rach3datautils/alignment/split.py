@@ -167,18 +167,21 @@ class Splits:
                                     "and audio file to be present in the "
                                     "session.")
 
+        note_array = performance.note_array()
         break_notes = MultimediaTools.find_breaks(
             performance=performance,
             length=break_size,
-            return_notes=True
+            return_notes=True,
+            note_array=note_array
         )
 
         section_notes = self.breaks_to_sections(
             performance=performance,
-            breaks=break_notes
+            breaks=break_notes,
+            note_array=note_array
         )
         sections = self.check_section_lengths(
-            note_array=performance.note_array(),
+            note_array=note_array,
             sections=section_notes
         )
 
@@ -189,9 +192,9 @@ class Splits:
             sync_args={"notes_index": (0, -1),
                        "search_period": 180,
                        "window_size": 100},
-            track_args={"hop_size": int(np.round(44100 * 0.1))}
+            track_args={"hop_size": int(np.round(44100 * 0.1))},
+            note_array=note_array
         )
-        note_array = performance.note_array()
 
         section_times: List[timestamps] = []
         prev_time = first_last_times[0]
@@ -214,7 +217,8 @@ class Splits:
                                "search_period": 15,
                                "start_end_times": (start_time, end_time),
                                "window_size": 1000},
-                    track_args={"hop_size": int(np.round(44100 * 0.005))}
+                    track_args={"hop_size": int(np.round(44100 * 0.005))},
+                    note_array=note_array
                 )
             except SyncError:
                 logger.error(f"Encountered errors while processing the "
@@ -230,7 +234,8 @@ class Splits:
     @staticmethod
     def breaks_to_sections(
             performance: Performance,
-            breaks: List[Tuple[int, int]]
+            breaks: List[Tuple[int, int]],
+            note_array: Optional[npt.NDArray] = None
     ) -> List[note_sections]:
         """
         Take a list with the output from find_breaks and convert it so that
@@ -244,19 +249,25 @@ class Splits:
         performance : Performance
         breaks : List[Tuple[int, int]]
             output from break_notes
+        note_array : npt.NDArray, optional
+            the note array of the performance, if it has already been
+            computed
 
         Returns
         -------
         note_section_list : List[note_sections]
             a list containing start and end points of sections as tuples
         """
+        if note_array is None:
+            note_array = performance.note_array()
+
         prev_note: int = 0
         sections: List[note_sections] = []
         for i in breaks:
             sections.append((prev_note, i[0]))
             prev_note = i[1]
 
-        sections.append((prev_note, len(performance.note_array()) - 1))
+        sections.append((prev_note, len(note_array) - 1))
 
         return sections
 
@@ -333,8 +344,11 @@ class Splits:
         return sections
 
     @staticmethod
-    def convert_to_timestamps(sections: List[note_sections],
-                              performance: Performance) -> List[timestamps]:
+    def convert_to_timestamps(
+            sections: List[note_sections],
+            performance: Performance,
+            note_array: Optional[npt.NDArray] = None
+    ) -> List[timestamps]:
         """
         Convert a list of note_sections to a list of timestamps
 
@@ -344,13 +358,17 @@ class Splits:
             list containing note sections (tuples with note indices)
         performance : Performance
             partitura performance object corresponding to sections
+        note_array : npt.NDArray, optional
+            the note array of the performance, if it has already been
+            computed
 
         Returns
         -------
         timestamps_list : List[timestamps]
             contains the sections converted to timestamps
         """
-        note_array = performance.note_array()
+        if note_array is None:
+            note_array = performance.note_array()
         timestamp_list: List[timestamps] = []
         for i in sections:
             first_time = note_array['onset_sec'][i[0]]
@@ -383,20 +401,24 @@ class Splits:
         if break_size is None:
             break_size = self.BREAK_SIZE
 
+        note_array = performance.note_array()
         breakpoints = MultimediaTools.find_breaks(
             performance=performance,
             length=break_size,
-            return_notes=True
+            return_notes=True,
+            note_array=note_array
         )
         breaks = self.breaks_to_sections(
             performance=performance,
             breaks=breakpoints,
+            note_array=note_array
         )
         breaks = self.check_section_lengths(
-            note_array=performance.note_array(),
+            note_array=note_array,
             sections=breaks,
         )
-        breaks = self.convert_to_timestamps(breaks, performance=performance)
+        breaks = self.convert_to_timestamps(breaks, performance=performance,
+                                            note_array=note_array)
 
         return breaks
 
@@ -427,21 +449,22 @@ def split_va_at_timestamps(splits: List[timestamps],
     -------
     None
     """
+    cuts = []
     for split_no, (start, end) in enumerate(splits):
         output_path_video = output_dir.joinpath(
             "rach3_" + file.stem + f"_split{split_no + 1}" + file.suffix
         )
 
         if output_path_video.exists() and not overwrite:
-            return
-
-        MultimediaTools.extract_section(
-            file=file,
-            start=start,
-            end=end,
-            output_file=output_path_video,
-            reencode=reencode
-        )
+            break
+
+        cuts.append((start, end, output_path_video))
+
+    MultimediaTools.batch_extract_sections(
+        file=file,
+        cuts=cuts,
+        reencode=reencode
+    )
 
 
 def split_midi_at_timestamps(splits: List[timestamps],
@@ -109,14 +109,14 @@ class Sync:
         if notes_index is None:
             notes_index = self.NOTES_INDEX
         if start_end_times is None:
-            start_end_times = (0, nonsynced_track.frame_times[-1])
+            start_end_times = (0, nonsynced_track.duration)
 
         first_note_time = note_array["onset_sec"][notes_index[0]]
 
         last_note_time = note_array["onset_sec"][notes_index[1]] + \
             note_array["duration_sec"][notes_index[1]]
 
-        window_time = synced_track.frame_times[self.window_size]
+        window_time = synced_track.get_time(self.window_size)
 
         # The first window is generated from the first note on to avoid index
         # errors with the start of the file
@@ -162,16 +162,16 @@ class Sync:
 
         first_note_nonsynced_window = first_distances.argmin()
         first_note_nonsynced_frame = first_note_nonsynced_window * self.stride
-        first_time = sect_border_first[0] + nonsynced_track.frame_times[
+        first_time = sect_border_first[0] + nonsynced_track.get_time(
             first_note_nonsynced_frame
-        ]
+        )
 
         last_note_nonsynced_window = np.argmin(last_distances)
         last_note_nonsynced_frame = \
             last_note_nonsynced_window * self.stride + self.window_size
-        last_time = sect_border_last[0] + nonsynced_track.frame_times[
+        last_time = sect_border_last[0] + nonsynced_track.get_time(
             last_note_nonsynced_frame
-        ]
+        )
 
         return first_time, last_time
 
@@ -268,7 +268,8 @@ def load_and_sync(
         audio: PathLike,
         track_args: Optional[TrackArgs] = None,
         sync_args: Optional[SyncArgs] = None,
-        sync_distance_func: Optional[Callable] = None
+        sync_distance_func: Optional[Callable] = None,
+        note_array: Optional[npt.NDArray] = None
 ) -> timestamps:
     """
     Function that handles loading flac and audio from a subsession and then
@@ -288,6 +289,8 @@ def load_and_sync(
         optional args to be passed to the Sync object
     sync_distance_func : Callable, optional
         optional custom distance function
+    note_array : npt.NDArray, optional
+        the note array of the performance, if it has already been computed
 
     Returns
     -------
@@ -300,6 +303,9 @@ def load_and_sync(
             "Some files are missing from the session"
         )
 
+    if note_array is None:
+        note_array = performance.note_array()
+
     sync = Sync(distance_func=sync_distance_func)
     flac = Track(
         filepath=flac,
@@ -312,6 +318,6 @@ def load_and_sync(
     return sync.calc_timestamps(
         synced_track=flac,
         nonsynced_track=aac,
-        note_array=performance.note_array(),
+        note_array=note_array,
         **sync_args
     )
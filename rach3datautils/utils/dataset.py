@@ -55,8 +55,8 @@ class DatasetUtils:
 
         files = []
         for dirpath in self.root:
-            [files.extend(PathUtils.get_files_by_type(dirpath, i))
-                for i in filetype]
+            for i in filetype:
+                files.extend(PathUtils.get_files_by_type(dirpath, i))
 
         return files
 
@@ -1,21 +1,27 @@
+import functools
 import os
 import shutil
 import tempfile
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
 from pathlib import Path
-from typing import Optional, Union, overload, Literal, List, Dict, Tuple
+from types import ModuleType
+from typing import (Optional, Union, overload, Literal, List, Dict, Tuple,
+                    Callable, Any, TYPE_CHECKING)
 
 import ffmpeg
 import numpy as np
 import numpy.typing as npt
-import partitura as pt
-from partitura.performance import Performance
-from partitura.performance import PerformedPart
-from partitura.utils.music import slice_ppart_by_time
 
 from rach3datautils.config import LOGLEVEL
 from rach3datautils.types import PathLike, timestamps
 
+# partitura takes about a second to import and is only needed by the midi
+# functions, so it's imported where it's used.
+if TYPE_CHECKING:
+    from partitura.performance import Performance, PerformedPart
+
 FFMPEG_LOGLEVELS = {
     "DEBUG": "debug",
     "INFO": "info",
@@ -25,6 +31,180 @@ FFMPEG_LOGLEVELS = {
 }
 FFMPEG_LOGLEVEL = FFMPEG_LOGLEVELS[LOGLEVEL]
 
+# Where extract_audio puts its output when none is given
+_DEFAULT_AUDIO_DIR = Path("..") / "audio_files"
+
+
+def _find_breaks_loop(onsets: npt.NDArray, length: float) -> npt.NDArray:
+    """
+    Single pass over the onsets returning a (k, 2) array of
+    (prev_note, next_note) pairs wherever the gap exceeds length. Written
+    as a plain loop so that it can be compiled by numba.
+    """
+    breaks = np.empty((max(onsets.shape[0] - 1, 0), 2), dtype=np.int32)
+    k = 0
+    for i in range(1, onsets.shape[0]):
+        if onsets[i] - onsets[i - 1] > length:
+            breaks[k, 0] = i - 1
+            breaks[k, 1] = i
+            k += 1
+    return breaks[:k]
+
+
+def _find_breaks_np(onsets: npt.NDArray, length: float) -> npt.NDArray:
+    """
+    Vectorized equivalent of _find_breaks_loop for when numba is not
+    available.
+    """
+    idx = np.flatnonzero(np.diff(onsets) > length).astype(np.int32)
+    return np.column_stack((idx, idx + 1))
+
+
+@functools.lru_cache(maxsize=None)
+def _find_break_notes() -> Callable[[npt.NDArray, float], npt.NDArray]:
+    """
+    Pick the implementation used by find_breaks on first use, so numba is
+    only imported when it's actually needed.
+    """
+    try:
+        import numba
+    except ModuleNotFoundError:
+        return _find_breaks_np
+    return numba.njit(cache=True)(_find_breaks_loop)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_probe(filepath: str, mtime: float) -> Dict:
+    """
+    ffprobe a file. The modification time is only part of the cache key so
+    that a file that has changed on disk gets probed again.
+    """
+    return ffmpeg.probe(filepath)
+
+
+def _first_video_stream(metadata: Dict) -> Dict:
+    """
+    Return the first video stream from ffprobe metadata.
+    """
+    for i in metadata.get("streams", []):
+        if i.get("codec_type") == "video":
+            return i
+    raise AttributeError("File does not contain a video stream.")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_av() -> Optional[ModuleType]:
+    """
+    Import PyAV on first use, so that it doesn't slow down importing this
+    module. None if it's not installed.
+    """
+    try:
+        import av
+    except ModuleNotFoundError:
+        return None
+    return av
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_av_duration(filepath: str, mtime: float) -> Optional[float]:
+    """
+    Read the container duration with PyAV, without starting an ffprobe
+    process. None if the container doesn't store a duration.
+    """
+    av = _get_av()
+    with av.open(filepath) as container:
+        if container.duration is None:
+            return None
+        return container.duration / av.time_base
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_decoded_duration(filepath: str, mtime: float) -> float:
+    """
+    Duration of the first audio stream from its packet timestamps. Only the
+    container is demuxed, no audio gets decoded.
+    """
+    packets = ffmpeg.probe(
+        filepath,
+        select_streams="a:0",
+        show_entries="packet=pts_time,duration_time"
+    ).get("packets", [])
+    packets = [i for i in packets
+               if "pts_time" in i and "duration_time" in i]
+    if not packets:
+        raise AttributeError("Could not parse the file.")
+
+    start = min(float(i["pts_time"]) for i in packets)
+    end = max(float(i["pts_time"]) + float(i["duration_time"])
+              for i in packets)
+    return end - start
+
+
+def _decode_raw_audio(filepath: str,
+                      mtime: float,
+                      sample_rate: int,
+                      input_kwargs: Tuple[Tuple[str, object], ...]) -> bytes:
+    """
+    Decode a file to mono 16 bit PCM. The modification time is unused, it's
+    only there so that _cached_raw_audio can use it as part of its key.
+    """
+    out, _ = (
+        ffmpeg.input(
+            filepath, **dict(input_kwargs)
+        ).output(
+            '-', format='s16le', acodec='pcm_s16le', ac=1, ar=sample_rate,
+            loglevel=FFMPEG_LOGLEVEL
+        ).overwrite_output(
+        ).run(
+            capture_stdout=True
+        )
+    )
+    return out
+
+
+# Only the last file is kept, since a whole recording is around 300 MB per
+# hour. The bytes are immutable, so they can safely be shared between callers.
+_cached_raw_audio = functools.lru_cache(maxsize=1)(_decode_raw_audio)
+
+
+def _select_in_range(items: List[dict],
+                     times: npt.NDArray,
+                     start: float,
+                     end: float) -> List[dict]:
+    """
+    Return the items whose time lies within [start, end].
+    """
+    if not items:
+        return []
+    return [items[j] for j in np.flatnonzero((times >= start) &
+                                             (times <= end))]
+
+
+def _narrow_ppart(performed_part: "PerformedPart",
+                  notes: List[dict],
+                  controls: List[dict],
+                  programs: List[dict]) -> "PerformedPart":
+    """
+    Create a PerformedPart holding only the given subset of another
+    PerformedPart's events, so that slicing it only has to look at those.
+    """
+    from partitura.performance import PerformedPart
+
+    # The notes are set after init so that the sustain pedal adjustment does
+    # not run again on note objects shared with the original part.
+    narrowed = PerformedPart(
+        notes=[],
+        id=performed_part.id,
+        part_name=performed_part.part_name,
+        controls=controls,
+        programs=programs,
+        sustain_pedal_threshold=performed_part.sustain_pedal_threshold,
+        ppq=performed_part.ppq,
+        mpq=performed_part.mpq
+    )
+    narrowed.notes = notes
+    return narrowed
+
 
 class MultimediaTools:
     """
@@ -37,8 +217,7 @@ class MultimediaTools:
         """
         Extract audio from a video file. Returns the filepath of the new audio
         file.
-        If no output is specified outputs the file in the same folder
-        as the original video.
+        If no output is specified outputs the file to ../audio_files.
 
         Parameters
         ----------
@@ -52,8 +231,7 @@ class MultimediaTools:
         """
 
         if output is None:
-            output = Path(os.path.join("..", "audio_files",
-                                       filepath.stem + "_audio.mp3"))
+            output = _DEFAULT_AUDIO_DIR / f"{filepath.stem}_audio.aac"
         elif not output.suffix == ".aac":
             raise AttributeError("Output must either be None or a valid path "
                                  "to a .acc file")
@@ -114,15 +292,37 @@ class MultimediaTools:
 
         streams = [str(i) for i in files if i.suffix in [".mp4", ".aac"]]
 
-        tmp = tempfile.NamedTemporaryFile(mode="w",
-                                          prefix="concat_file",
-                                          suffix=".txt")
+        if MultimediaTools._can_concat_protocol(streams):
+            # Raw AAC (ADTS) files can simply be joined byte by byte, no
+            # demuxer or file list needed.
+            MultimediaTools._run_concat(
+                ffmpeg.input("concat:" + "|".join(streams)),
+                output=output,
+                reencode=reencode
+            )
+            return output
 
-        with open(tmp.name, "w") as f:
-            [f.write(f"file '{stream}'\n") for stream in streams]
+        with tempfile.NamedTemporaryFile(mode="w",
+                                         prefix="concat_file",
+                                         suffix=".txt") as tmp:
+            tmp.write("".join(f"file '{i}'\n" for i in streams))
+            tmp.flush()
+            MultimediaTools._run_concat(
+                ffmpeg.input(tmp.name, f='concat', safe=0),
+                output=output,
+                reencode=reencode
+            )
 
-        # This is a bit of a hack, there's probably a better way to do it.
-        concatenated = ffmpeg.input(Path(f.name), f='concat', safe=0)
+        return output
+
+    @staticmethod
+    def _run_concat(concatenated: ffmpeg.nodes.FilterableStream,
+                    output: Path,
+                    reencode: bool) -> None:
+        """
+        Write the concatenated input to output, either stream copying or
+        reencoding it.
+        """
         if reencode:
             out = ffmpeg.output(concatenated,
                                 filename=output,
@@ -135,28 +335,45 @@ class MultimediaTools:
         out = ffmpeg.overwrite_output(out)
         out.run()
 
-        tmp.close()
-        return output
+    @staticmethod
+    def _can_concat_protocol(files: List[str]) -> bool:
+        """
+        Whether files can be joined with ffmpeg's concat protocol, which is
+        only the case for raw .aac files. The inputs are parts of the same
+        recording, so only the first one is probed to check that it holds a
+        single AAC stream.
+        """
+        if not files or not all(i.endswith(".aac") and "|" not in i
+                                for i in files):
+            return False
+
+        audio = [i for i in MultimediaTools.ff_probe(files[0])["streams"]
+                 if i.get("codec_type") == "audio"]
+        return len(audio) == 1 and audio[0].get("codec_name") == "aac"
 
     @staticmethod
     @overload
     def find_breaks(
-            performance: Performance, length: float,
-            return_notes: Literal[True]) -> list[tuple[int, int]]:
+            performance: "Performance", length: float,
+            return_notes: Literal[True],
+            note_array: Optional[npt.NDArray] = None
+    ) -> list[tuple[int, int]]:
         ...
 
     @staticmethod
     @overload
     def find_breaks(
-            performance: Performance, length: float,
-            return_notes: Optional[Literal[False]] = None) -> \
-            list[tuple[float, float]]:
+            performance: "Performance", length: float,
+            return_notes: Optional[Literal[False]] = None,
+            note_array: Optional[npt.NDArray] = None
+    ) -> list[tuple[float, float]]:
         ...
 
     @staticmethod
-    def find_breaks(performance: Performance,
+    def find_breaks(performance: "Performance",
                     length: float,
-                    return_notes: Optional[bool] = None) -> List[
+                    return_notes: Optional[bool] = None,
+                    note_array: Optional[npt.NDArray] = None) -> List[
             Union[tuple[float, float], tuple[int, int]]]:
         """
         Take a midi performance partitura object and find spots where nothing
@@ -174,6 +391,9 @@ class MultimediaTools:
             the midi performance object
         length : float
             how many seconds nothing was played
+        note_array : npt.NDArray, optional
+            the note array of the performance, if it has already been
+            computed. Saves generating it again.
 
         Returns
         -------
@@ -182,73 +402,85 @@ class MultimediaTools:
         """
         if return_notes is None:
             return_notes = False
+        if note_array is None:
+            note_array = performance.note_array()
 
-        note_array = performance.note_array()
         if len(note_array.shape) != 1:
             raise AttributeError("Midi files with more than one track are "
                                  "unsupported.")
 
-        breaks = []
-        prev_time = note_array[0][0]
-        prev_note = 0
-        for no, i in enumerate(note_array):
-            time = i[0]
-            if time - prev_time > length:
-                if return_notes:
-                    breaks.append((prev_note, no))
-                else:
-                    breaks.append((prev_time, time))
-            prev_time = time
-            prev_note = no
+        onsets = np.ascontiguousarray(note_array["onset_sec"],
+                                      dtype=np.float64)
+        if return_notes:
+            breaks = _find_break_notes()(onsets, length)
+            return [tuple(i) for i in breaks.tolist()]
 
+        gaps = np.diff(onsets)
+        idx = np.flatnonzero(gaps > length)
+        breaks = list(zip(onsets[idx].tolist(), onsets[idx + 1].tolist()))
         return breaks
 
     @staticmethod
-    def get_first_time(performance: Performance) -> float:
+    def get_first_time(performance: "Performance",
+                       note_array: Optional[npt.NDArray] = None) -> float:
         """
         Get the time of the first note in a performance.
 
         Parameters
         ----------
         performance : Performance
+        note_array : npt.NDArray, optional
+            the note array of the performance, if it has already been
+            computed
 
         Returns
         -------
         first_time : float
         """
-        note_array = performance.note_array()
+        if note_array is None:
+            note_array = performance.note_array()
         return note_array[0][0]
 
     @staticmethod
-    def get_last_time(performance: Performance) -> float:
+    def get_last_time(performance: "Performance",
+                      note_array: Optional[npt.NDArray] = None) -> float:
         """
         Get the timestamp when the last note was played.
 
         Parameters
         ----------
         performance : Performance
+        note_array : npt.NDArray, optional
+            the note array of the performance, if it has already been
+            computed
 
         Returns
         -------
         last_time : float
         """
-        note_array = performance.note_array()
+        if note_array is None:
+            note_array = performance.note_array()
         return max(note_array["onset_sec"])
 
     @staticmethod
-    def get_last_offset(performance: Performance):
+    def get_last_offset(performance: "Performance",
+                        note_array: Optional[npt.NDArray] = None):
         """
         Last note in note array + duration of that note
 
         Parameters
         ----------
         performance : Performance
+        note_array : npt.NDArray, optional
+            the note array of the performance, if it has already been
+            computed
 
         Returns
         -------
         last_offset : float
         """
-        note_array = performance.note_array()
+        if note_array is None:
+            note_array = performance.note_array()
         return max(note_array["onset_sec"] + note_array["duration_sec"])
 
     @staticmethod
@@ -256,10 +488,16 @@ class MultimediaTools:
                     split_start: float,
                     split_end: float,
                     output: Path,
-                    overwrite: Optional[bool] = None) -> PathLike:
+                    overwrite: Optional[bool] = None,
+                    sample_accurate: Optional[bool] = None) -> PathLike:
         """
         Extract a section of an audio file given start and end points.
 
+        By default the audio stream is copied without re-encoding, so the
+        cut points snap to the nearest audio packets. Set sample_accurate
+        to cut exactly at the given times, at the cost of a full decode and
+        re-encode.
+
         Parameters
         ----------
         output : Path
@@ -272,6 +510,8 @@ class MultimediaTools:
             the place in seconds at which to split audio
         overwrite : bool, optional
             bool, whether to overwrite already existing files
+        sample_accurate : bool, optional
+            whether to cut with the atrim filter and re-encode, default False
 
         Returns
         -------
@@ -280,24 +520,95 @@ class MultimediaTools:
         """
         if overwrite is None:
             overwrite = False
+        if sample_accurate is None:
+            sample_accurate = False
 
         if not output.suffix:
             raise AttributeError("Output must be a path to a file")
         elif output.is_file() and not overwrite:
             return output
 
-        input_file = ffmpeg.input(audio_path)
-        audio = input_file.audio
-        trimmed = audio.filter("atrim", start=split_start, end=split_end)
-        out = ffmpeg.output(trimmed, filename=output, loglevel=FFMPEG_LOGLEVEL)
+        if sample_accurate:
+            audio = ffmpeg.input(audio_path).audio
+            trimmed = audio.filter("atrim", start=split_start, end=split_end)
+            out = ffmpeg.output(trimmed, filename=output,
+                                loglevel=FFMPEG_LOGLEVEL)
+        else:
+            audio = ffmpeg.input(audio_path, ss=split_start).audio
+            out = ffmpeg.output(audio, filename=output,
+                                to=split_end - split_start, c="copy",
+                                loglevel=FFMPEG_LOGLEVEL)
         out = ffmpeg.overwrite_output(out)
         out.run()
 
         return output
 
+    @staticmethod
+    def split_audio_batch(audio_path: PathLike,
+                          segments: List[Tuple[float, float, Path]],
+                          overwrite: Optional[bool] = None,
+                          sample_accurate: Optional[bool] = None
+                          ) -> List[Path]:
+        """
+        Extract multiple sections of an audio file using a single ffmpeg
+        process. Equivalent to calling split_audio for every segment, but
+        without starting a new ffmpeg process each time. Stream copied
+        sections are cut by :meth:`batch_extract_sections`.
+
+        Parameters
+        ----------
+        audio_path : PathLike
+            path to audio file as a Path or string
+        segments : List[Tuple[float, float, Path]]
+            (split_start, split_end, output) for each section
+        overwrite : bool, optional
+            bool, whether to overwrite already existing files
+        sample_accurate : bool, optional
+            whether to cut with the atrim filter and re-encode, default False
+
+        Returns
+        -------
+        audio_files : List[Path]
+            paths of the new audio files, in the same order as `segments`
+        """
+        if overwrite is None:
+            overwrite = False
+        if sample_accurate is None:
+            sample_accurate = False
+
+        pending = []
+        for split_start, split_end, output in segments:
+            if not output.suffix:
+                raise AttributeError("Output must be a path to a file")
+            elif output.is_file() and not overwrite:
+                continue
+            pending.append((split_start, split_end, output))
+
+        if not sample_accurate:
+            MultimediaTools.batch_extract_sections(audio_path, pending,
+                                                   audio_only=True)
+        elif pending:
+            full_audio = ffmpeg.input(audio_path).audio
+            outputs = [
+                ffmpeg.output(
+                    full_audio.filter("atrim", start=split_start,
+                                      end=split_end),
+                    filename=output,
+                    loglevel=FFMPEG_LOGLEVEL
+                )
+                for split_start, split_end, output in pending
+            ]
+            out = ffmpeg.merge_outputs(*outputs)
+            out = ffmpeg.overwrite_output(out)
+            out.run()
+
+        return [i[2] for i in segments]
+
     def get_len(self, audio_path: PathLike) -> float:
         """
-        Get the length in seconds of a media file.
+        Get the length in seconds of a media file. Reads the file header
+        in-process with PyAV if it's installed, and uses ffprobe otherwise or
+        if PyAV can't read the file.
 
         Parameters
         ----------
@@ -307,13 +618,100 @@ class MultimediaTools:
         -------
         length : float
         """
+        av = _get_av()
+        if av is not None:
+            filepath = os.fspath(audio_path)
+            try:
+                duration = _cached_av_duration(filepath,
+                                               os.path.getmtime(filepath))
+            except (av.error.FFmpegError, OSError):
+                # Leave files PyAV can't open to ffprobe
+                duration = None
+            if duration is not None:
+                return duration
+
         metadata = self.ff_probe(audio_path)
         duration = float(metadata["format"]["duration"])
         return duration
 
     @staticmethod
-    def ff_probe(filepath: PathLike):
-        return ffmpeg.probe(filepath)
+    def ff_probe(filepath: PathLike) -> Dict:
+        """
+        Get the ffprobe metadata of a media file. Results are cached per
+        file path and modification time, so repeated calls on the same file
+        don't spawn a new ffprobe process. The returned dict is shared
+        between calls and should not be modified.
+
+        Parameters
+        ----------
+        filepath : PathLike
+
+        Returns
+        -------
+        metadata : Dict
+        """
+        filepath = os.fspath(filepath)
+        return _cached_probe(filepath, os.path.getmtime(filepath))
+
+    @staticmethod
+    def probe_batch(filepaths: List[PathLike],
+                    max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Probe many files at once, running the ffprobe processes in parallel.
+        The results are stored in the same cache as ff_probe.
+
+        Parameters
+        ----------
+        filepaths : List[PathLike]
+        max_workers : int, optional
+            how many ffprobe processes to run at once, default is the number
+            of CPUs
+
+        Returns
+        -------
+        metadata_list : List[Dict]
+            metadata for each file, in the same order as filepaths
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(MultimediaTools.ff_probe, filepaths))
+
+    @staticmethod
+    def map_parallel(fn: Callable[..., Any],
+                     args: List[Tuple],
+                     max_workers: Optional[int] = None) -> List[Any]:
+        """
+        Call fn once for every tuple of arguments in args, running the calls
+        in parallel. Meant for the ffmpeg based methods: the actual work
+        happens in the ffmpeg subprocesses, so threads are enough to keep
+        several of them running at once.
+
+        Parameters
+        ----------
+        fn : Callable
+            function to call
+        args : List[Tuple]
+            positional arguments for each call
+        max_workers : int, optional
+            how many calls to run at once, default is half the number of
+            CPUs since ffmpeg is multithreaded itself. 1 runs everything
+            sequentially in the calling thread, which is useful for debugging.
+
+        Returns
+        -------
+        results : List[Any]
+            the return values, in the same order as args
+        """
+        if max_workers is None:
+            max_workers = max((os.cpu_count() or 1) // 2, 1)
+
+        if max_workers == 1 or len(args) <= 1:
+            return [fn(*i) for i in args]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda i: fn(*i), args))
 
     @staticmethod
     def delete_files(files: List[Path]) -> None:
@@ -328,7 +726,8 @@ class MultimediaTools:
         -------
         None
         """
-        [os.remove(i) for i in files]
+        for i in files:
+            os.remove(i)
 
     @staticmethod
     def trim_silence(file: Path,
@@ -427,48 +826,85 @@ class MultimediaTools:
         out.run()
 
     @staticmethod
-    def get_decoded_duration(file: PathLike) -> float:
+    def batch_extract_sections(file: PathLike,
+                               cuts: List[Tuple[float, float, PathLike]],
+                               reencode: Optional[bool] = None,
+                               audio_only: Optional[bool] = None) -> None:
         """
-        Get the duration of a file by decoding its audio. This will yield more
-        accurate results than get_len.
+        Extract multiple sections from one file using a single ffmpeg
+        process, avoiding starting a new ffmpeg process for every section
+        as extract_section would. Every section keeps the first video and
+        first audio stream of the file, if present, mirroring ffmpeg's
+        default stream selection, or only the audio streams if audio_only
+        is set. Will overwrite files.
 
         Parameters
         ----------
         file : PathLike
+            the path to the video or audio
+        cuts : List[Tuple[float, float, PathLike]]
+            (start, end, output_file) for each section
+        reencode : bool, optional
+            whether to reencode the file or not
+        audio_only : bool, optional
+            whether to keep only the audio streams, as split_audio does,
+            default False
 
         Returns
         -------
-        file_len : float
-            in seconds
+        None
         """
-        ffmpeg_in = ffmpeg.input(file).audio
-        out = ffmpeg_in.output(filename="-", f='null')
-        ffmpeg_return = out.run(capture_stderr=True)[1]
-
-        # Parsing the output to get the time
-        split_return = ffmpeg_return.split(b"\n")
-        encode_sub = None
-        for i in split_return:
-            if i[:5] == b"size=":
-                encode_sub = i.split(b"\r")[-1].split(b" ")
-                encode_sub.reverse()
-                break
+        if reencode is None:
+            reencode = False
+        if audio_only is None:
+            audio_only = False
+        if not cuts:
+            return
 
-        if encode_sub is None:
-            raise AttributeError("Could not parse the file.")
+        # Every section gets its own input so that seeking works the same
+        # way as in extract_section, but all of them share one process.
+        # Streams are mapped explicitly, since with several inputs ffmpeg
+        # only applies its default selection to the first output.
+        outputs = []
+        for start, end, output_file in cuts:
+            ffmpeg_in = ffmpeg.input(file, ss=start)
+            if audio_only:
+                streams = [ffmpeg_in.audio]
+            else:
+                streams = [ffmpeg_in["v:0?"], ffmpeg_in["a:0?"]]
+            if reencode:
+                out = ffmpeg.output(*streams, filename=output_file,
+                                    to=end-start, loglevel=FFMPEG_LOGLEVEL)
+            else:
+                out = ffmpeg.output(*streams, filename=output_file,
+                                    to=end-start, c="copy",
+                                    loglevel=FFMPEG_LOGLEVEL)
+            outputs.append(out)
+
+        out = ffmpeg.merge_outputs(*outputs)
+        out = ffmpeg.overwrite_output(out)
+        out.run()
 
-        time = []
-        for i in encode_sub:
-            if b"time=" in i:
-                time = str(i)[7:-1].split(":")
-                break
+    @staticmethod
+    def get_decoded_duration(file: PathLike) -> float:
+        """
+        Get the duration of a file from the timestamps of its audio packets.
+        This will yield more accurate results than get_len.
 
-        time = sum([j * float(i) for i, j in zip(time, [60*60, 60, 1])])
+        Parameters
+        ----------
+        file : PathLike
 
-        return time
+        Returns
+        -------
+        file_len : float
+            in seconds
+        """
+        filepath = os.fspath(file)
+        return _cached_decoded_duration(filepath, os.path.getmtime(filepath))
 
     @staticmethod
-    def load_performance(file: PathLike) -> pt.performance.Performance:
+    def load_performance(file: PathLike) -> "Performance":
         """
         Load a midi performance as a partitura performance object.
 
@@ -480,14 +916,16 @@ class MultimediaTools:
         -------
         performance : partitura.performance.Performance
         """
+        import partitura as pt
+
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             return pt.load_performance_midi(file)
 
     @staticmethod
-    def split_performance(performed_part: PerformedPart,
+    def split_performance(performed_part: "PerformedPart",
                           split_points: List[timestamps]) -> \
-            List[PerformedPart]:
+            List["PerformedPart"]:
         """
         Take a performance and section timestamps and return a list of
         PerformedPart objects based on the timestamps.
@@ -503,13 +941,43 @@ class MultimediaTools:
         pp_list : List[PerformedPart]
             a list of sub-performances
         """
+        from partitura.utils.music import slice_ppart_by_time
+
+        notes = performed_part.notes
+        onsets = np.fromiter((n["note_on"] for n in notes), dtype=np.float64,
+                             count=len(notes))
+        offsets = np.fromiter((n["note_off"] for n in notes),
+                              dtype=np.float64, count=len(notes))
+        control_times = np.array([c["time"] for c in performed_part.controls])
+        program_times = np.array([p["time"] for p in performed_part.programs])
+
+        # Notes are sorted by onset, so the candidate notes of every section
+        # can be found with one binary search instead of a full scan.
+        starts = np.array([i[0] for i in split_points], dtype=np.float64)
+        ends = np.array([i[1] for i in split_points], dtype=np.float64)
+        lo = np.searchsorted(onsets, starts, side="left")
+        hi = np.searchsorted(onsets, ends, side="left")
+
         subperformances: List[PerformedPart] = []
-        for i in split_points:
+        for (start, end), first, last in zip(split_points, lo, hi):
+            # Notes that started before the section but are still sounding
+            held = np.flatnonzero(offsets[:first] > start)
+            section_notes = [notes[j] for j in held]
+            section_notes.extend(notes[first:last])
+
+            narrowed = _narrow_ppart(
+                performed_part=performed_part,
+                notes=section_notes,
+                controls=_select_in_range(performed_part.controls,
+                                          control_times, start, end),
+                programs=_select_in_range(performed_part.programs,
+                                          program_times, start, end)
+            )
             subperformances.append(
                 slice_ppart_by_time(
-                    ppart=performed_part,
-                    start_time=i[0],
-                    end_time=i[1],
+                    ppart=narrowed,
+                    start_time=start,
+                    end_time=end,
                     clip_note_off=True,
                     reindex_notes=True
                 )
@@ -519,16 +987,24 @@ class MultimediaTools:
     @staticmethod
     def read_raw_audio(filepath: PathLike,
                        sample_rate: int,
-                       input_kwargs: Optional[Dict] = None) -> bytes:
+                       input_kwargs: Optional[Dict] = None,
+                       cache: Optional[bool] = None) -> bytes:
         """
         Read audio from a file using FFMPEG.
 
+        With cache set, the decoded audio of the last file read this way is
+        kept, so reading it again with the same arguments does not decode it
+        a second time. It stays in memory until another file is read with
+        cache set, or :meth:`clear_raw_audio_cache` is called.
+
         Parameters
         ----------
         filepath : PathLike
         sample_rate : int
         input_kwargs : Dict
             any additional arguments you want to pass
+        cache : bool, optional
+            whether to keep the decoded audio for later calls, default False
 
         Returns
         -------
@@ -537,19 +1013,24 @@ class MultimediaTools:
         """
         if input_kwargs is None:
             input_kwargs = {}
-
-        out, _ = (
-            ffmpeg.input(
-                filepath, **input_kwargs
-            ).output(
-                '-', format='s16le', acodec='pcm_s16le', ac=1, ar=sample_rate,
-                loglevel=FFMPEG_LOGLEVEL
-            ).overwrite_output(
-            ).run(
-                capture_stdout=True
-            )
+        if cache is None:
+            cache = False
+
+        filepath = os.fspath(filepath)
+        decode = _cached_raw_audio if cache else _decode_raw_audio
+        return decode(
+            filepath,
+            os.path.getmtime(filepath),
+            sample_rate,
+            tuple(sorted(input_kwargs.items()))
         )
-        return out
+
+    @staticmethod
+    def clear_raw_audio_cache() -> None:
+        """
+        Release the audio kept by :meth:`read_raw_audio` with cache set.
+        """
+        _cached_raw_audio.cache_clear()
 
     def load_file_audio(self,
                         filepath: PathLike,
@@ -576,9 +1057,27 @@ class MultimediaTools:
         float_data = data_s16 * 0.5**15
         return float_data
 
+    @staticmethod
+    def get_resolution(filepath: PathLike) -> Tuple[int, int]:
+        """
+        Get the resolution of the first video stream in a file.
+
+        Parameters
+        ----------
+        filepath : PathLike
+            path to a video file
+
+        Returns
+        -------
+        resolution : Tuple[int, int]
+            (width, height)
+        """
+        stream = _first_video_stream(MultimediaTools.ff_probe(filepath))
+        return int(stream["width"]), int(stream["height"])
+
     @staticmethod
     def load_video(filepath: PathLike,
-                   resolution: Tuple[int, int],
+                   resolution: Optional[Tuple[int, int]],
                    frames: Tuple[int, int]) -> npt.NDArray:
         """
         Load a video file directly into memory without the audio. This loads
@@ -587,8 +1086,9 @@ class MultimediaTools:
         Parameters
         ----------
         filepath : PathLike
-        resolution : Tuple[int, int]
-            (width, height), e.g. (1920, 1080)
+        resolution : Tuple[int, int] or None
+            (width, height), e.g. (1920, 1080). If None, it's read from the
+            file's metadata.
         frames : Tuple[int, int]
             start and stop frames for the section to be loaded
 
@@ -600,6 +1100,8 @@ class MultimediaTools:
         if frames[1] - frames[0] < 0:
             raise AttributeError("The second value in frames should be larger "
                                  "than the first!")
+        if resolution is None:
+            resolution = MultimediaTools.get_resolution(filepath)
         out, _ = (
             ffmpeg
             .input(filepath, ss=frames[0])
@@ -616,8 +1118,10 @@ class MultimediaTools:
 
     def get_no_frames(self, filepath: PathLike) -> int:
         """
-        Find the number of frames in a video with ffprobe. Assumes that the
-        video stream is at index zero.
+        Find the number of frames in a video with ffprobe, using the first
+        video stream in the file. If the container does not store the
+        number of frames, it is estimated from the stream duration and frame
+        rate.
 
         Parameters
         ----------
@@ -628,5 +1132,10 @@ class MultimediaTools:
         -------
         no_frames : int
         """
-        probe = self.ff_probe(filepath)["streams"][0]["nb_frames"]
-        return probe
+        stream = _first_video_stream(self.ff_probe(filepath))
+        no_frames = stream.get("nb_frames", "N/A")
+        if no_frames != "N/A":
+            return int(no_frames)
+
+        frame_rate = Fraction(stream["r_frame_rate"])
+        return int(float(stream["duration"]) * frame_rate)
@@ -1,5 +1,6 @@
+import functools
 import re
-from pathlib import Path
+from pathlib import Path, PurePath
 from typing import Union, Literal, Tuple, get_args, List
 from datetime import datetime
 import time
@@ -14,13 +15,27 @@ filetypes = Literal["midi", "full_midi", "flac", "full_flac", "mp4",
 suffixes = Literal[".aac", ".flac", ".mp4", ".mid"]
 suffixes_list: Tuple[suffixes, ...] = get_args(suffixes)
 
+_SPLIT_PAT = re.compile(r"^split\d{1,2}$")
+
+
+@functools.lru_cache(maxsize=65536)
+def _tokens(name: str) -> Tuple[Tuple[str, ...], str]:
+    """
+    Split a filename into the underscore separated tokens of its stem and its
+    suffix. Cached since the same file usually goes through several of the
+    PathUtils checks.
+    """
+    path = PurePath(name)
+    return tuple(path.stem.split("_")), path.suffix
+
 
 class PathUtils:
     """
     Contains various functions that help working with paths within the dataset.
     """
 
-    def get_type(self, path: Path) -> Union[filetypes, None]:
+    @staticmethod
+    def get_type(path: Path) -> Union[filetypes, None]:
         """
         Get the type of the given file.
 
@@ -41,37 +56,38 @@ class PathUtils:
 
         The current way this works is fragile and overly verbose.
         """
-        if self.is_warmup(path):
+        if PathUtils.is_warmup(path):
             return
-        elif path.stem.split("_")[0] != "rach3":
+        tokens, suffix = _tokens(path.name)
+        if tokens[0] != "rach3":
             return
 
-        if path.suffix == ".mid":
-            if self.is_valid_midi(path):
+        if suffix == ".mid":
+            if PathUtils.is_valid_midi(path):
                 return "full_midi"
-            elif self.is_split(path):
+            elif PathUtils.is_split(path):
                 return "split_midi"
 
-        elif path.suffix == ".flac":
-            if self.is_valid_flac(path):
+        elif suffix == ".flac":
+            if PathUtils.is_valid_flac(path):
                 return "full_flac"
-            elif self.is_split(path):
+            elif PathUtils.is_split(path):
                 return "split_flac"
 
-        elif path.suffix == ".mp4":
-            if self.is_trimmed(path):
+        elif suffix == ".mp4":
+            if PathUtils.is_trimmed(path):
                 return "trimmed_video"
-            elif self.is_full_video(path):
+            elif PathUtils.is_full_video(path):
                 return "full_video"
-            elif self.is_valid_video(path):
+            elif PathUtils.is_valid_video(path):
                 return "video"
-            elif self.is_split(path):
+            elif PathUtils.is_split(path):
                 return "split_video"
 
-        elif path.suffix == ".aac":
-            if self.is_full_audio(path):
+        elif suffix == ".aac":
+            if PathUtils.is_full_audio(path):
                 return "full_audio"
-            elif self.is_valid_audio(path):
+            elif PathUtils.is_valid_audio(path):
                 return "audio"
 
     @staticmethod
@@ -87,8 +103,8 @@ class PathUtils:
         -------
         bool
         """
-        return any([bool(re.search(r"^split\d{1,2}$", i)) for i in
-                    file.stem.split("_")])
+        tokens, _ = _tokens(file.name)
+        return any(_SPLIT_PAT.search(i) for i in tokens)
 
     @staticmethod
     def is_valid_video(file: Path) -> bool:
@@ -103,7 +119,8 @@ class PathUtils:
         -------
         bool
         """
-        return file.stem.split("_")[-1][0] == "p" and file.suffix == ".mp4"
+        tokens, suffix = _tokens(file.name)
+        return tokens[-1][0] == "p" and suffix == ".mp4"
 
     @staticmethod
     def is_valid_audio(file: Path) -> bool:
@@ -118,7 +135,8 @@ class PathUtils:
         -------
         bool
         """
-        return file.stem.split("_")[-1][0] == "p" and file.suffix == ".aac"
+        tokens, suffix = _tokens(file.name)
+        return tokens[-1][0] == "p" and suffix == ".aac"
 
     @staticmethod
     def get_session_no(file: Path) -> Union[str, None]:
@@ -134,7 +152,7 @@ class PathUtils:
         session_no : str or None
             None if no number can be found
         """
-        for i in file.stem.split("_"):
+        for i in _tokens(file.name)[0]:
             if re.search(pattern="(^a|^v)\\d\\d$", string=i):
                 return "a" + i[-2:]
         return None
@@ -180,7 +198,8 @@ class PathUtils:
         -------
         bool
         """
-        return "full" in file.stem.split("_") and file.suffix == ".aac"
+        tokens, suffix = _tokens(file.name)
+        return "full" in tokens and suffix == ".aac"
 
     @staticmethod
     def get_fileno_a(file: Path) -> int:
@@ -227,7 +246,7 @@ class PathUtils:
         -------
         bool
         """
-        return "trimmed" in file.stem.split("_")
+        return "trimmed" in _tokens(file.name)[0]
 
     @staticmethod
     def is_warmup(file: Path) -> bool:
@@ -242,7 +261,7 @@ class PathUtils:
         -------
         bool
         """
-        return file.stem.split("_")[0] == "warmup"
+        return _tokens(file.name)[0][0] == "warmup"
 
     @staticmethod
     def is_valid_flac(file: Path) -> bool:
@@ -257,7 +276,8 @@ class PathUtils:
         -------
         bool
         """
-        return file.suffix == ".flac" and file.stem.split("_")[-1][0] == "a"
+        tokens, suffix = _tokens(file.name)
+        return suffix == ".flac" and tokens[-1][0] == "a"
 
     @staticmethod
     def is_valid_midi(file: Path) -> bool:
@@ -272,7 +292,8 @@ class PathUtils:
         -------
         bool
         """
-        return file.suffix == ".mid" and file.stem.split("_")[-1][0] == "a"
+        tokens, suffix = _tokens(file.name)
+        return suffix == ".mid" and tokens[-1][0] == "a"
 
     @staticmethod
     def is_full_video(file: Path) -> bool:
@@ -287,7 +308,8 @@ class PathUtils:
         -------
         bool
         """
-        return file.stem.split("_")[-1] == "full" and file.suffix == ".mp4"
+        tokens, suffix = _tokens(file.name)
+        return tokens[-1] == "full" and suffix == ".mp4"
 
     @staticmethod
     def get_files_by_type(root: Path,
@@ -325,10 +347,11 @@ class PathUtils:
         int
         """
         no = re.search(pattern="\\d{1,2}",
-                       string=file.stem.split("_")[-1]).group()
+                       string=_tokens(file.name)[0][-1]).group()
         return int(no)
 
-    def get_split_num_id(self, file: Path):
+    @staticmethod
+    def get_split_num_id(file: Path):
         """
         Combine the date and split number values into one int which can
         be used when sorting a list of splits.
@@ -345,9 +368,9 @@ class PathUtils:
             An int with the first half representing the date and end
             representing split number.
         """
-        date = self.get_date(file)
+        date = PathUtils.get_date(file)
         date_parsed = datetime.strptime(date, "%Y-%m-%d")
-        split_no = self.get_split_no(file)
+        split_no = PathUtils.get_split_no(file)
         if split_no >= 100:
             raise AttributeError("Cannot get split_num_id of a split "
                                  "that's larger than 100.")
@@ -1,12 +1,18 @@
+import itertools
+import operator
+import os
+from functools import lru_cache, cached_property
 from pathlib import Path
-from typing import Union, Optional, List, Tuple, Literal
-
-from partitura.performance import Performance
+from typing import (Union, Optional, List, Tuple, Literal, Dict, Callable,
+                    Iterator, TYPE_CHECKING)
 
 from rach3datautils.exceptions import IdentityError
 from rach3datautils.types import PathLike
 from rach3datautils.utils.multimedia import MultimediaTools
-from rach3datautils.utils.path import PathUtils
+from rach3datautils.utils.path import PathUtils, filetypes
+
+if TYPE_CHECKING:
+    from partitura.performance import Performance
 
 full_session_id = Tuple[str, str]  # (date, subsession_no)
 # A file can either be composed of many parts, "multi", or just be one part
@@ -14,11 +20,32 @@ full_session_id = Tuple[str, str]  # (date, subsession_no)
 session_file_types = Literal["multi", "single"]
 
 
+def _as_path(value: PathLike) -> Path:
+    return value if isinstance(value, Path) else Path(value)
+
+
+@lru_cache(maxsize=4096)
+def _file_identity_cached(path_str: str) -> full_session_id:
+    path = Path(path_str)
+    return PathUtils.get_date(path), PathUtils.get_session_no(path)
+
+
+@lru_cache(maxsize=256)
+def _attrgetter(path: str) -> operator.attrgetter:
+    return operator.attrgetter(path)
+
+
+@lru_cache(maxsize=4096)
+def _file_type_cached(path_str: str) -> Union[filetypes, None]:
+    return PathUtils.get_type(Path(path_str))
+
+
 class SessionIdentity:
     """
     Handles session identity storage and identity checks for files. All files
     from the same session should have the same session identity.
     """
+    __slots__ = ("date", "subsession_no", "full_id", "_verified")
 
     def __init__(self):
         self.date: Optional[str] = None
@@ -26,9 +53,13 @@ class SessionIdentity:
         # Full ID is useful when doing ID comparisons to avoid having to
         # compare all the variables individually.
         self.full_id: Optional[full_session_id] = None
+        # Paths that have already passed check_identity for the current id
+        self._verified: set[str] = set()
 
     def __str__(self):
-        return "_".join([str(i) for i in self.full_id])
+        if self.full_id is None:
+            return "None"
+        return f"{self.full_id[0]}_{self.full_id[1]}"
 
     @staticmethod
     def get_file_identity(file: Path) -> full_session_id:
@@ -44,11 +75,7 @@ class SessionIdentity:
         full_session_id : Tuple[str, str]
             contains (date, subsession_no)
         """
-
-        date = PathUtils.get_date(file)
-        subsession_no = PathUtils.get_session_no(file)
-
-        return date, subsession_no
+        return _file_identity_cached(str(file))
 
     def check_identity(self, file: Path) -> bool:
         """
@@ -69,6 +96,10 @@ class SessionIdentity:
             if the identity of the given file does not match with the current
             stored identity
         """
+        key = os.fspath(file)
+        if key in self._verified:
+            return True
+
         file_id = self.get_file_identity(file)
 
         if self.full_id is None:
@@ -78,6 +109,43 @@ class SessionIdentity:
             raise IdentityError("Trying to set a file from the wrong "
                                 "session.")
 
+        self._verified.add(key)
+        return True
+
+    def check_identities(self, files: List[Path]) -> bool:
+        """
+        Check the identity of many files at once. Works like
+        :meth:`check_identity`, but all files are validated with a single
+        comparison before any of them is accepted.
+
+        Parameters
+        ----------
+        files : List[Path]
+
+        Returns
+        -------
+        bool
+
+        Raises
+        ------
+        IdentityError
+            if the identity of any of the given files does not match with
+            the current stored identity
+        """
+        keys = {os.fspath(i): i for i in files}
+        for i in self._verified.intersection(keys):
+            del keys[i]
+        if not keys:
+            return True
+
+        ids = {self.get_file_identity(i) for i in keys.values()}
+        if self.full_id is None:
+            self.set(next(iter(keys.values())))
+        if ids != {self.full_id}:
+            raise IdentityError("Trying to set a file from the wrong "
+                                "session.")
+
+        self._verified.update(keys)
         return True
 
     def set(self, file: Path):
@@ -103,6 +171,7 @@ class SessionIdentity:
         self.date = date
         self.subsession_no = subsession_no
         self.full_id = (self.date, self.subsession_no)
+        self._verified.clear()
 
 
 class SessionFile:
@@ -119,6 +188,8 @@ class SessionFile:
     set to guarantee that different SessionFile objects have the same
     sorting.
     """
+    __slots__ = ("id", "type", "_file_list", "_splits_list", "_file",
+                 "_trimmed", "_last_split_key")
 
     def __init__(self,
                  identity: SessionIdentity,
@@ -131,16 +202,21 @@ class SessionFile:
         """
         self.id: SessionIdentity = identity
         self.type: str = file_type
-        self._file_list: List[Optional[Path]] = []
-        self._splits_list: List[Optional[Path]] = []
+        self._file_list: List[Path] = []
+        self._splits_list: List[Path] = []
         self._file: Optional[Path] = None
         self._trimmed: Optional[Path] = None
+        # Sort key of the last split, lets add_split append in-order files
+        # without searching the list.
+        self._last_split_key: Optional[int] = None
 
     def _list_id_check(self, values: List[Path]) -> None:
-        [self.id.check_identity(i) for i in values]
+        if not values:
+            return
+        self.id.check_identities(values)
 
     @property
-    def splits_list(self) -> List[Optional[Path]]:
+    def splits_list(self) -> List[Path]:
         """
         List of files that make up the original file after it's been
         split as part of the alignment process from
@@ -149,54 +225,108 @@ class SessionFile:
 
         Because the list is sorted, it's easy to iterate through a
         session simply by zipping all the split lists in the session.
-        To maintain this property, please refrain from modifying the
-        actual list itself. Instead, when modifying the list, call the
-        list setter, which auto-sorts it.
+        To maintain this property, a copy of the list is returned.
+        Use the list setter, which auto-sorts it, or :meth:`add_split` to
+        modify it.
 
         Returns
         -------
-        splits_list : List[Optional[Path]]
+        splits_list : List[Path]
         """
-        return self._splits_list
+        return list(self._splits_list)
 
     @splits_list.setter
-    def splits_list(self, value: List[Optional[PathLike]]) -> None:
+    def splits_list(self, value: List[PathLike]) -> None:
         if not value:
             return
-        paths = [Path(i) for i in value]
+        paths = sorted((_as_path(i) for i in value),
+                       key=PathUtils.get_split_num_id)
         self._list_id_check(values=paths)
         self._splits_list = paths
-        self.sort_splits()
+        self._last_split_key = PathUtils.get_split_num_id(paths[-1])
+
+    def add_split(self, path: PathLike) -> None:
+        """
+        Add a single file to the splits list, inserting it at its sorted
+        position. Unlike setting the whole list, only the new file is
+        checked and the list does not need to be sorted again.
+
+        Parameters
+        ----------
+        path : PathLike
+        """
+        path = _as_path(path)
+        self.id.check_identity(path)
+
+        key = PathUtils.get_split_num_id(path)
+        if not self._splits_list or key >= self._last_split_key:
+            self._splits_list.append(path)
+            self._last_split_key = key
+            return
+
+        # bisect.insort only takes a key from Python 3.10 onwards
+        lo, hi = 0, len(self._splits_list)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < PathUtils.get_split_num_id(self._splits_list[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+        self._splits_list.insert(lo, path)
 
     def sort_splits(self) -> None:
         """
         Sort the list of splits. Does nothing if the list does not exist.
         """
-        if not self.splits_list:
+        if not self._splits_list:
             return
-        self.splits_list.sort(key=PathUtils().get_split_num_id)
+        self._splits_list.sort(key=PathUtils.get_split_num_id)
+        self._last_split_key = PathUtils.get_split_num_id(
+            self._splits_list[-1])
+
+    def sort_files(self) -> None:
+        """
+        Sort the file list in chronological order.
+        """
+        self._file_list.sort(key=PathUtils.get_fileno_p)
 
     @property
-    def file_list(self) -> List[Optional[Path]]:
+    def file_list(self) -> List[Path]:
         """
-        The list of files that represent one larger recording.
+        The list of files that represent one larger recording. A copy is
+        returned, use the list setter or :meth:`add_file` to modify it.
 
         Returns
         -------
-        file_list : List[Optional[Path]]
+        file_list : List[Path]
         """
-        return self._file_list
+        return list(self._file_list)
 
     @file_list.setter
-    def file_list(self, value: List[Optional[PathLike]]) -> None:
+    def file_list(self, value: List[PathLike]) -> None:
         if self.type != "multi":
             return
         if not value:
             return
-        paths = [Path(i) for i in value]
+        paths = [_as_path(i) for i in value]
         self._list_id_check(values=paths)
         self._file_list = paths
 
+    def add_file(self, path: PathLike) -> None:
+        """
+        Append a single file to the file list. Does nothing if the object is
+        not multi-file.
+
+        Parameters
+        ----------
+        path : PathLike
+        """
+        if self.type != "multi":
+            return
+        path = _as_path(path)
+        self.id.check_identity(path)
+        self._file_list.append(path)
+
     @property
     def file(self) -> Union[Path, None]:
         """
@@ -216,7 +346,7 @@ class SessionFile:
             self._file = None
             return
 
-        value = Path(value)
+        value = _as_path(value)
         self.id.check_identity(value)
         self._file = value
 
@@ -237,7 +367,7 @@ class SessionFile:
             self._trimmed = None
             return
 
-        value = Path(value)
+        value = _as_path(value)
         self.id.check_identity(value)
         self._trimmed = value
 
@@ -247,13 +377,22 @@ class SessionFile:
 
         Returns
         -------
-        file_list : List[PathLike]
+        file_list : List[Path]
         """
-        all_files = [self.file, self.trimmed]
-        all_files.extend(self.splits_list)
-        all_files.extend(self.file_list)
-        files_list = [i for i in all_files if i is not None]
-        return files_list
+        return list(self.iter_all_files())
+
+    def iter_all_files(self) -> Iterator[Path]:
+        """
+        Iterate over all files currently in the SessionFile object without
+        building a list.
+
+        Returns
+        -------
+        files : Iterator[Path]
+        """
+        # Only the single paths can be None, the lists never hold None
+        singles = (i for i in (self._file, self._trimmed) if i is not None)
+        return itertools.chain(singles, self._splits_list, self._file_list)
 
 
 class Session:
@@ -285,7 +424,7 @@ class Session:
                  video: Optional[SessionFile] = None,
                  midi: Optional[SessionFile] = None,
                  flac: Optional[SessionFile] = None,
-                 performance: Optional[Performance] = None):
+                 performance: Optional["Performance"] = None):
         """
         Initializes session, can optionally supply any of the objects
         in the session. The session identity will automatically be set
@@ -320,13 +459,32 @@ class Session:
         self.video: SessionFile = video
         self.midi: SessionFile = midi
         self.flac: SessionFile = flac
-        self._performance: Optional[Performance] = performance
 
-    @property
-    def performance(self) -> Performance:
+        # Resolve which SessionFile attribute each filetype belongs to and
+        # how it's stored there once, so that set_unknown doesn't have to
+        # work it out for every file. The SessionFile itself is looked up
+        # when dispatching in case one of them gets replaced.
+        self._dispatch: Dict[
+            str, Tuple[str, Callable[[SessionFile, Path], None]]
+        ] = {"trimmed_video": ("video", SessionFile.trimmed.fset)}
+        for k in self.SPLIT_KEYS:
+            self._dispatch[k] = (k.removeprefix("split_"),
+                                 SessionFile.add_split)
+        for k in self.LIST_PATH_KEYS:
+            self._dispatch[k] = (k, SessionFile.add_file)
+        for k in self.PATH_KEYS:
+            self._dispatch[k] = (k.removeprefix("full_"),
+                                 SessionFile.file.fset)
+        if performance is not None:
+            # Pre-seed the cached_property
+            self.__dict__["performance"] = performance
+
+    @cached_property
+    def performance(self) -> "Performance":
         """
         Get the partitura :external:class:`.Performance` object. If it
-        does not exist, it will be loaded from the midi file.
+        does not exist, it will be loaded from the midi file the first time
+        it is accessed.
 
         Returns
         -------
@@ -337,23 +495,19 @@ class Session:
         AttributeError
             If no midi file is present within the session
         """
-        if self._performance is None:
-            res = self._load_performance_from_midi()
-            if not res:
-                raise AttributeError("Tried to load the performance but no "
-                                     "midi file present in Session.")
-        return self._performance
+        return self._load_performance_from_midi()
 
-    def _load_performance_from_midi(self) -> bool:
-        """Attempt to load a performance from the stored MIDI file, returns
-        False if no MIDI file is found.
+    def _load_performance_from_midi(self) -> "Performance":
+        """Load a performance from the stored MIDI file, raises an
+        AttributeError if no MIDI file is found.
         """
         midi_filepath = self.midi.file
         if midi_filepath is None:
-            return False
-        self._performance = MultimediaTools.load_performance(midi_filepath)
-        self._performance[0].sustain_pedal_threshold = 127
-        return True
+            raise AttributeError("Tried to load the performance but no "
+                                 "midi file present in Session.")
+        performance = MultimediaTools.load_performance(midi_filepath)
+        performance[0].sustain_pedal_threshold = 127
+        return performance
 
     def set_unknown(self, value: Union[PathLike, list[PathLike]]) -> bool:
         """
@@ -375,29 +529,17 @@ class Session:
         if not isinstance(value, list):
             value = [value]
 
-        for i in value:
-            file = Path(i)
-            self.id.check_identity(file)
-            filetype = PathUtils().get_type(file)
-
-            if filetype == "trimmed_video":
-                self.video.trimmed = file
-
-            if filetype in self.SPLIT_KEYS:
-                attribute: SessionFile = getattr(self, filetype[6:])
-                attribute.splits_list.append(file)
-                attribute.splits_list = attribute.splits_list
+        files = [_as_path(i) for i in value]
+        self.id.check_identities(files)
 
-            if filetype in self.LIST_PATH_KEYS:
-                attribute: SessionFile = getattr(self, filetype)
-                attribute.file_list.append(file)
+        for file in files:
+            filetype = _file_type_cached(str(file))
 
-            elif filetype in self.PATH_KEYS:
-                attribute: SessionFile = getattr(self, filetype[5:])
-                attribute.file = file
-
-            else:
+            target = self._dispatch.get(filetype)
+            if target is None:
                 return False
+            attribute, handler = target
+            handler(getattr(self, attribute), file)
         return True
 
     def sort_videos(self):
@@ -409,7 +551,7 @@ class Session:
         -------
         None
         """
-        self.video.file_list.sort(key=PathUtils.get_fileno_p)
+        self.video.sort_files()
         self.video.sort_splits()
 
     def sort_audios(self):
@@ -421,7 +563,7 @@ class Session:
         -------
         None
         """
-        self.audio.file_list.sort(key=PathUtils.get_fileno_p)
+        self.audio.sort_files()
         self.audio.sort_splits()
 
     def check_properties(self, properties: Union[List[str], str]) -> bool:
@@ -439,16 +581,13 @@ class Session:
         bool
             True if property exists, False otherwise.
         """
+        if isinstance(properties, str):
+            properties = [properties]
+
         for i in properties:
-            attrs = i.split(".")
-            obj = self
             try:
-                for j in attrs:
-                    obj = getattr(obj, j)
-
-                if obj is None:
+                if _attrgetter(i)(self) is None:
                     return False
-
             except AttributeError:
                 return False
         return True
@@ -461,8 +600,7 @@ class Session:
         -------
         file_list : List[Path]
         """
-        file_list = []
-        for i in [self.audio, self.video, self.midi, self.flac]:
-            file_list.extend(i.all_files())
-
-        return file_list
+        return list(itertools.chain.from_iterable(
+            i.iter_all_files()
+            for i in (self.audio, self.video, self.midi, self.flac)
+        ))
@@ -1,19 +1,103 @@
+import functools
 from pathlib import Path
-from typing import Optional, TypedDict, Tuple, Union, Dict
+from types import ModuleType
+from typing import (Optional, TypedDict, Tuple, Union, Dict, List, Literal,
+                    TYPE_CHECKING)
 
-import madmom
 import numpy as np
 import numpy.typing as npt
-from madmom.audio.signal import FramedSignal
+import scipy.fft
 
 from rach3datautils.types import PathLike, timestamps
 from rach3datautils.utils.multimedia import MultimediaTools
 
+if TYPE_CHECKING:
+    from madmom.audio.filters import Filterbank, LogarithmicFilterbank
+    from madmom.audio.signal import FramedSignal
+
+_madmom: Optional[ModuleType] = None
+
+
+def _get_madmom() -> ModuleType:
+    """
+    Import madmom the first time it's needed. It's slow to import, and
+    scripts that only import Track through other modules never use it.
+    """
+    global _madmom
+    if _madmom is None:
+        import madmom
+        _madmom = madmom
+    return _madmom
+
+
+@functools.lru_cache(maxsize=16)
+def _log_filterbank(num_fft_bins: int,
+                    sample_rate: int) -> "LogarithmicFilterbank":
+    """
+    The default logarithmic filterbank used by
+    madmom.audio.LogarithmicFilteredSpectrogram for the given STFT size.
+    """
+    audio = _get_madmom().audio
+    return audio.filters.LogarithmicFilterbank(
+        audio.stft.fft_frequencies(num_fft_bins, sample_rate)
+    )
+
+
+def _log_spec_scipy(signal: "FramedSignal",
+                    filterbank: "Filterbank",
+                    start: Optional[int] = None,
+                    stop: Optional[int] = None,
+                    block_size: int = 512) -> npt.NDArray:
+    """
+    Compute the same logarithmic filtered spectrogram as madmom for frames
+    start to stop, but with one multithreaded scipy FFT per block of frames
+    instead of one numpy FFT per frame. Frames are built from a zero padded
+    copy of only the samples they cover, following madmom's framing, and
+    blocks keep the temporary frame matrix small.
+    """
+    if start is None:
+        start = 0
+    if stop is None:
+        stop = signal.shape[0]
+    frame_size = signal.frame_size
+    num_frames = stop - start
+    data = np.asarray(signal.signal)
+
+    window = np.hanning(frame_size).astype(np.float32)
+    if np.issubdtype(data.dtype, np.integer):
+        window /= np.iinfo(data.dtype).max
+
+    # madmom centers frame i on sample i * hop_size and zero pads the edges
+    starts = (np.arange(start, stop) * signal.hop_size).astype(np.intp)
+    starts -= frame_size // 2
+    low, high = starts[0], starts[-1] + frame_size
+    padded = np.zeros(high - low, dtype=np.float32)
+    first, last = max(low, 0), min(high, data.shape[0])
+    if last > first:
+        padded[first - low:last - low] = data[first:last]
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame_size)
+    starts -= low
+
+    num_bins = frame_size >> 1
+    spec = np.empty((num_frames, filterbank.shape[1]), dtype=np.float32)
+    for i in range(0, num_frames, block_size):
+        block = frames[starts[i:i + block_size]] * window
+        stft = scipy.fft.rfft(block, axis=1, workers=-1)[:, :num_bins]
+        spec[i:i + block_size] = np.dot(np.abs(stft), filterbank)
+
+    np.add(spec, 1, out=spec)
+    np.log10(spec, out=spec)
+    return spec
+
+
+spectrogram_backends = Literal["madmom", "scipy"]
+
 
 class TrackArgs(TypedDict, total=False):
     frame_size: Optional[int]
     sample_rate: Optional[int]
     hop_size: Optional[float]
+    backend: Optional[spectrogram_backends]
 
 
 class Track:
@@ -29,7 +113,8 @@ class Track:
                  filepath: PathLike,
                  frame_size: Optional[int] = None,
                  sample_rate: Optional[int] = None,
-                 hop_size: Optional[float] = None):
+                 hop_size: Optional[float] = None,
+                 backend: Optional[spectrogram_backends] = None):
         """
         Parameters
         ----------
@@ -41,6 +126,10 @@ class Track:
             sample rate to be used when loading, default: 44100
         hop_size : float, optional
             essentially the resolution, default: 1102
+        backend : spectrogram_backends, optional
+            how to compute spectrograms, "madmom" or "scipy". The scipy
+            backend computes the FFTs in multithreaded batches, which is
+            faster for long files. Default: "madmom"
         """
         if frame_size is None:
             frame_size = self.FRAME_SIZE
@@ -48,6 +137,10 @@ class Track:
             sample_rate = self.SAMPLE_RATE
         if hop_size is None:
             hop_size = self.HOP_SIZE
+        if backend is None:
+            backend = "madmom"
+        if backend not in ("madmom", "scipy"):
+            raise AttributeError("backend should be either madmom or scipy.")
 
         filepath = Path(filepath)
 
@@ -65,14 +158,17 @@ class Track:
         self.hop_size: int = hop_size
         self.sample_rate: int = sample_rate
         self.filepath: PathLike = filepath
+        self.backend: spectrogram_backends = backend
 
-        self.signal: FramedSignal = self.load_framed_signal(
+        self.signal: "FramedSignal" = self.load_framed_signal(
             data=data,
             frame_size=frame_size,
             hop_size=hop_size,
             sample_rate=sample_rate
         )
-        self.frame_times: npt.NDArray = self.calc_frame_times()
+        # Spectrograms of the whole track, keyed by the band clip they were
+        # computed for. None means all bands.
+        self._log_specs: Dict[Optional[Tuple[int, int]], npt.NDArray] = {}
 
     @property
     def duration(self) -> float:
@@ -83,7 +179,88 @@ class Track:
         -------
         duration : float
         """
-        return self.frame_times[-1]
+        return self.get_time(self.signal.shape[0] - 1)
+
+    @property
+    def log_spec(self) -> npt.NDArray:
+        """
+        The logarithmic filtered spectrogram of the whole track. Computed the
+        first time it's accessed and kept in memory afterwards.
+
+        Returns
+        -------
+        log_spec : npt.NDArray
+            float32 array with shape (frames, frequency bands)
+        """
+        return self.get_log_spec()
+
+    def get_log_spec(
+            self,
+            spectrogram_clip: Optional[Tuple[int, int]] = None,
+            start: Optional[int] = None,
+            end: Optional[int] = None
+    ) -> npt.NDArray:
+        """
+        The logarithmic filtered spectrogram of the frames from start to end,
+        limited to the frequency bands within spectrogram_clip. Only the
+        requested frames are transformed, and the filterbank is clipped
+        before it's applied so bands outside the clip are never computed.
+        Spectrograms of the whole track are kept per clip, and later
+        requests for the same clip are served as read-only views of them.
+
+        Parameters
+        ----------
+        spectrogram_clip : Tuple[int, int], optional
+            tuple of band indexes, default is all bands
+        start : int, optional
+            first frame, default zero
+        end : int, optional
+            frame to stop at (exclusive), default is end of track
+
+        Returns
+        -------
+        log_spec : npt.NDArray
+            float32 array with shape (frames, frequency bands)
+        """
+        num_frames = self.signal.shape[0]
+        if start is None:
+            start = 0
+        if end is None:
+            end = num_frames
+        if spectrogram_clip is not None:
+            spectrogram_clip = tuple(spectrogram_clip)
+
+        full_spec = self._log_specs.get(spectrogram_clip)
+        if full_spec is not None:
+            return full_spec[start:end]
+        full_spec = self._log_specs.get(None)
+        if full_spec is not None:
+            return full_spec[start:end,
+                             spectrogram_clip[0]:spectrogram_clip[1]]
+
+        filterbank = _log_filterbank(self.signal.frame_size // 2,
+                                     self.sample_rate)
+        if spectrogram_clip is not None:
+            filterbank = _get_madmom().audio.filters.Filterbank(
+                filterbank[:, spectrogram_clip[0]:spectrogram_clip[1]],
+                bin_frequencies=filterbank.bin_frequencies
+            )
+        if self.backend == "scipy":
+            spec = _log_spec_scipy(self.signal, filterbank, start, end)
+        else:
+            spec = _get_madmom().audio.LogarithmicFilteredSpectrogram(
+                self.signal[start:end],
+                filterbank=filterbank
+            )
+            # Drop the madmom subclass without copying. madmom normally
+            # computes in float32 already, in which case the cast doesn't
+            # copy either.
+            spec = spec.view(np.ndarray).astype(np.float32, copy=False)
+
+        if start == 0 and end == num_frames:
+            spec.setflags(write=False)
+            self._log_specs[spectrogram_clip] = spec
+        return spec
 
     def get_frame(self, time: float) -> int:
         """
@@ -100,27 +277,54 @@ class Track:
         frame : int
             the frame index closest to the time given
         """
-        return abs((self.frame_times - time)).argmin()
+        # Frames are evenly spaced so the closest one can be computed directly
+        frame = int(round(time * self.sample_rate / self.hop_size))
+        return min(max(frame, 0), self.signal.shape[0] - 1)
 
-    def calc_frame_times(self) -> npt.NDArray:
+    def get_frames(self,
+                   times: Union[npt.NDArray, List[float]]) -> npt.NDArray:
         """
-        Calculate the frame times of the signal.
+        Vectorized version of get_frame, get the closest frame for every
+        timestamp given.
+
+        Parameters
+        ----------
+        times : Union[npt.NDArray, List[float]]
+            timestamps in seconds
 
         Returns
         -------
-        frame_times : npt.NDArray
-            has an index for every frame at which you can see the time
+        frames : npt.NDArray
+            frame indexes closest to the times given
+        """
+        frames = np.rint(
+            np.asarray(times, dtype=np.float64) * self.sample_rate /
+            self.hop_size
+        ).astype(np.intp)
+        return np.clip(frames, 0, self.signal.shape[0] - 1)
+
+    def get_time(self, frame: int) -> float:
         """
-        return np.arange(
-            self.signal.shape[0]
-        ) * (self.hop_size / self.sample_rate)
+        Get the timestamp of a frame in seconds. Inverse of get_frame.
+
+        Parameters
+        ----------
+        frame : int
+            frame index
+
+        Returns
+        -------
+        time : float
+            time in seconds at which the frame starts
+        """
+        return frame * self.hop_size / self.sample_rate
 
     @staticmethod
     def load_framed_signal(data: Union[PathLike, npt.NDArray],
                            frame_size: int,
                            hop_size: int,
                            sample_rate: int,
-                           kwargs: Optional[Dict] = None) -> FramedSignal:
+                           kwargs: Optional[Dict] = None) -> "FramedSignal":
         """
         Load a file into a signal.
 
@@ -146,6 +350,7 @@ class Track:
         if isinstance(data, Path):
             data = str(data)
 
+        madmom = _get_madmom()
         signal = madmom.audio.Signal(
             data,
             sample_rate=sample_rate,
@@ -172,6 +377,9 @@ class Track:
         points.
         Uses the logarithmic filtered spectrogram by default.
 
+        Only the frames within the section are transformed, see
+        :meth:`get_log_spec`.
+
         spectrogram_clip specifies the start and end of the frequency bands
         index, useful for reducing ram usage and improving performance if you
         don't need the whole range of frequency bands.
@@ -198,17 +406,12 @@ class Track:
         if spectrogram_clip is None:
             spectrogram_clip = (10, 40)
 
-        start = self.get_frame(start)
-        end = self.get_frame(end)
+        start, end = self.get_frames([start, end])
 
         if end - start <= 0:
             raise AttributeError("The given end should be larger than the "
                                  "start.")
 
-        spec = np.array(
-            madmom.audio.LogarithmicFilteredSpectrogram(
-                self.signal[start:end][:]
-            )
-        )[:, spectrogram_clip[0]:spectrogram_clip[1]]
+        spec = self.get_log_spec(spectrogram_clip, int(start), int(end))
 
-        return (self.frame_times[start], self.frame_times[end]), spec
+        return (self.get_time(start), self.get_time(end)), spec